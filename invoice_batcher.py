@@ -0,0 +1,138 @@
+"""Envío agrupado de facturas a Siigo."""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from siigo_client import SiigoClient
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+_Pending = Tuple[Dict[str, Any], Optional[str], Future]
+
+
+class InvoiceBatcher:
+    """
+    Agrupa facturas pendientes y las envía de forma concurrente.
+
+    Un lote se despacha cuando alcanza max_batch facturas, cuando pasan
+    flush_ms sin recibir una nueva, o cuando pasan max_wait_ms desde la
+    primera factura del lote.
+    """
+
+    def __init__(
+        self,
+        client: SiigoClient,
+        max_batch: int = 50,
+        flush_ms: int = 200,
+        max_wait_ms: int = 1000,
+        max_workers: int = 8,
+    ):
+        self._client = client
+        self._max_batch = max_batch
+        self._flush = flush_ms / 1000
+        self._max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="siigo-batch")
+        self._closed = False
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="siigo-batcher", daemon=True)
+        self._worker.start()
+        # El hilo es daemon: sin esto, las facturas aún en la ventana se perderían al salir.
+        atexit.register(self.close)
+
+    def enqueue(self, invoice_data: Dict[str, Any], email: Optional[str] = None) -> Future:
+        """Encola una factura y retorna un Future con la respuesta de Siigo."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("InvoiceBatcher cerrado")
+            self._queue.put((invoice_data, email, future))
+        return future
+
+    def close(self) -> None:
+        """Despacha las facturas pendientes y libera los hilos."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        atexit.unregister(self.close)
+        self._worker.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "InvoiceBatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            try:
+                stop = self._collect(batch)
+                self._dispatch(batch)
+            except Exception as e:
+                # Si el hilo muriera, los Future pendientes nunca se resolverían.
+                self._fail(batch, e)
+                stop = False
+            if stop:
+                return
+
+    def _collect(self, batch: List[_Pending]) -> bool:
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            timeout = min(self._flush, deadline - time.monotonic())
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    def _dispatch(self, batch: List[_Pending]) -> None:
+        for invoice_data, email, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._executor.submit(self._submit, invoice_data, email, future)
+            except RuntimeError:
+                # El pool ya no acepta tareas (p. ej. close() desde atexit, cuando el
+                # intérprete ya apagó los ThreadPoolExecutor): enviar en este hilo.
+                self._submit(invoice_data, email, future)
+
+    @staticmethod
+    def _fail(batch: List[_Pending], error: Exception) -> None:
+        for _, _, future in batch:
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+    def _submit(self, invoice_data: Dict[str, Any], email: Optional[str], future: Future) -> None:
+        try:
+            result = self._client.create_invoice(invoice_data)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        future.set_result(result)
+
+        if email:
+            try:
+                self._client.send_invoice_email(result["id"], email)
+            except Exception:
+                logger.exception("No se pudo enviar la factura %s por correo", result["id"])
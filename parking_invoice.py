@@ -1,23 +1,74 @@
 """Módulo de Facturación Electrónica Siigo para Parqueadero."""
 
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 from config import SIIGO_ACCESS_KEY, SIIGO_APP_NAME, SIIGO_USERNAME
+from invoice_batcher import InvoiceBatcher
 from siigo_client import SiigoClient
 
-SIIGO_CONFIG = {
-    "document_type_id": None,
-    "seller_id": None,
-    "payment_type_id": None,
-    "tax_id": None,
-}
+if TYPE_CHECKING:
+    from siigo_client_async import AsyncSiigoClient
+
+
+@dataclass(slots=True)
+class SiigoConfig:
+    document_type_id: Optional[int] = None
+    seller_id: Optional[int] = None
+    payment_type_id: Optional[int] = None
+    tax_id: Optional[int] = None
+
+
+SIIGO_CONFIG = SiigoConfig()
 
 ITEM_PARQUEADERO = {
     "code": "PARQUEADERO",
     "description": "Servicio de Parqueadero"
 }
 
+logger = logging.getLogger(__name__)
+
+_email_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="siigo-mail")
+atexit.register(_email_pool.shutdown, wait=True)
+
+_client_lock = threading.Lock()
+_client_singleton: Optional[SiigoClient] = None
+_async_client_singleton: Optional["AsyncSiigoClient"] = None
+
+
+def _get_client() -> SiigoClient:
+    """Retorna el cliente compartido para reutilizar token y conexiones."""
+    global _client_singleton
+    if _client_singleton is None:
+        with _client_lock:
+            if _client_singleton is None:
+                _client_singleton = SiigoClient(
+                    username=SIIGO_USERNAME,
+                    access_key=SIIGO_ACCESS_KEY,
+                    application_name=SIIGO_APP_NAME
+                )
+    return _client_singleton
+
+
+def _get_async_client() -> "AsyncSiigoClient":
+    # Importación diferida: httpx solo es necesario para el flujo asíncrono.
+    from siigo_client_async import AsyncSiigoClient
+
+    global _async_client_singleton
+    if _async_client_singleton is None:
+        _async_client_singleton = AsyncSiigoClient(
+            username=SIIGO_USERNAME,
+            access_key=SIIGO_ACCESS_KEY,
+            application_name=SIIGO_APP_NAME
+        )
+    return _async_client_singleton
+
 
 def emit_electronic_invoice(
     *,
@@ -26,7 +77,8 @@ def emit_electronic_invoice(
     full_name: str,
     email: str,
     total_amount_cop: int,
-) -> Dict[str, Any]:
+    batcher: Optional[InvoiceBatcher] = None,
+) -> Union[Dict[str, Any], Future]:
     """
     Crea factura electrónica en Siigo para servicio de parqueadero.
 
@@ -36,9 +88,117 @@ def emit_electronic_invoice(
         full_name: Nombre o razón social
         email: Correo electrónico
         total_amount_cop: Monto total en COP
+        batcher: InvoiceBatcher opcional para envío agrupado
+
+    Retorna la respuesta de Siigo con la factura creada, o un Future con
+    esa respuesta si se usa batcher.
+    """
+    invoice_data, email = _build_invoice_data(
+        placa=placa,
+        id_number=id_number,
+        full_name=full_name,
+        email=email,
+        total_amount_cop=total_amount_cop,
+    )
+
+    if batcher is not None:
+        return batcher.enqueue(invoice_data, email)
+
+    client = _get_client()
+
+    result = client.create_invoice(invoice_data)
+
+    if email:
+        _email_pool.submit(_safe_send_email, client, result["id"], email)
+
+    return result
+
+
+def _safe_send_email(client: SiigoClient, invoice_id: str, email: str) -> None:
+    try:
+        client.send_invoice_email(invoice_id, email)
+    except Exception:
+        logger.exception("No se pudo enviar la factura %s por correo", invoice_id)
+
+
+async def emit_electronic_invoice_async(
+    *,
+    placa: str,
+    id_number: str,
+    full_name: str,
+    email: str,
+    total_amount_cop: int,
+    client: Optional["AsyncSiigoClient"] = None,
+) -> Dict[str, Any]:
+    """
+    Versión asíncrona de emit_electronic_invoice.
 
-    Retorna la respuesta de Siigo con la factura creada.
+    Sin client usa el cliente asíncrono compartido; al terminar de usarlo en
+    un event loop, llama cerrar_cliente_async() para liberar sus conexiones.
     """
+    invoice_data, email = _build_invoice_data(
+        placa=placa,
+        id_number=id_number,
+        full_name=full_name,
+        email=email,
+        total_amount_cop=total_amount_cop,
+    )
+
+    client = client or _get_async_client()
+
+    result = await client.create_invoice(invoice_data)
+
+    if email:
+        try:
+            await client.send_invoice_email(result["id"], email)
+        except Exception:
+            logger.exception("No se pudo enviar la factura %s por correo", result["id"])
+
+    return result
+
+
+async def emit_electronic_invoices_bulk(items: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Emite varias facturas de forma concurrente.
+
+    Cada elemento de items contiene los argumentos de emit_electronic_invoice.
+    Retorna los resultados en el mismo orden; las facturas que fallan
+    aparecen como la excepción correspondiente.
+    """
+    from siigo_client_async import AsyncSiigoClient
+
+    # Cliente propio del lote: cerrarlo al final no afecta a otras corrutinas que
+    # usan el cliente compartido. El token se toma y se devuelve al compartido.
+    shared = _get_async_client()
+    async with AsyncSiigoClient(
+        username=SIIGO_USERNAME,
+        access_key=SIIGO_ACCESS_KEY,
+        application_name=SIIGO_APP_NAME
+    ) as client:
+        client.adopt_token(shared)
+        try:
+            return await asyncio.gather(
+                *(emit_electronic_invoice_async(**item, client=client) for item in items),
+                return_exceptions=True,
+            )
+        finally:
+            shared.adopt_token(client)
+
+
+async def cerrar_cliente_async() -> None:
+    """Cierra las conexiones del cliente asíncrono compartido, conservando el token."""
+    if _async_client_singleton is not None:
+        await _async_client_singleton.close()
+
+
+def _build_invoice_data(
+    *,
+    placa: str,
+    id_number: str,
+    full_name: str,
+    email: str,
+    total_amount_cop: int,
+) -> Tuple[Dict[str, Any], str]:
     placa = (placa or "").strip().upper()
     id_number = (id_number or "").strip()
     full_name = (full_name or "").strip()
@@ -58,101 +218,72 @@ def emit_electronic_invoice(
 
     _validar_config()
 
-    client = SiigoClient(
-        username=SIIGO_USERNAME,
-        access_key=SIIGO_ACCESS_KEY,
-        application_name=SIIGO_APP_NAME
-    )
-
     today = datetime.now().strftime("%Y-%m-%d")
 
     invoice_data = {
-        "document": {"id": SIIGO_CONFIG["document_type_id"]},
+        "document": {"id": SIIGO_CONFIG.document_type_id},
         "date": today,
         "customer": {
             "identification": id_number,
             "branch_office": 0
         },
-        "seller": SIIGO_CONFIG["seller_id"],
+        "seller": SIIGO_CONFIG.seller_id,
         "items": [{
             "code": ITEM_PARQUEADERO["code"],
             "description": ITEM_PARQUEADERO["description"],
             "quantity": 1,
             "price": total_amount_cop,
             "discount": 0,
-            "taxes": [{"id": SIIGO_CONFIG["tax_id"]}] if SIIGO_CONFIG["tax_id"] else []
+            "taxes": [{"id": SIIGO_CONFIG.tax_id}] if SIIGO_CONFIG.tax_id else []
         }],
         "payments": [{
-            "id": SIIGO_CONFIG["payment_type_id"],
+            "id": SIIGO_CONFIG.payment_type_id,
             "value": total_amount_cop,
             "due_date": today
         }],
         "observations": f"Placa: {placa} - Cliente: {full_name}"
     }
-
-    result = client.create_invoice(invoice_data)
-
-    if email:
-        try:
-            client.send_invoice_email(result["id"], email)
-        except Exception:
-            pass
-
-    return result
+    return invoice_data, email
 
 
 def _validar_config() -> None:
-    required = ["document_type_id", "seller_id", "payment_type_id"]
-    missing = [k for k in required if not SIIGO_CONFIG.get(k)]
+    required = ("document_type_id", "seller_id", "payment_type_id")
+    missing = [k for k in required if not getattr(SIIGO_CONFIG, k)]
     if missing:
         raise ValueError(f"Faltan IDs de configuración: {missing}. Ejecuta get_siigo_ids() para obtenerlos.")
 
 
 def configurar_siigo(document_type_id: int, seller_id: int, payment_type_id: int, tax_id: int = None) -> None:
-    SIIGO_CONFIG["document_type_id"] = document_type_id
-    SIIGO_CONFIG["seller_id"] = seller_id
-    SIIGO_CONFIG["payment_type_id"] = payment_type_id
+    SIIGO_CONFIG.document_type_id = document_type_id
+    SIIGO_CONFIG.seller_id = seller_id
+    SIIGO_CONFIG.payment_type_id = payment_type_id
     if tax_id:
-        SIIGO_CONFIG["tax_id"] = tax_id
+        SIIGO_CONFIG.tax_id = tax_id
 
 
 def get_siigo_ids() -> None:
-    client = SiigoClient(
-        username=SIIGO_USERNAME,
-        access_key=SIIGO_ACCESS_KEY,
-        application_name=SIIGO_APP_NAME
-    )
+    client = _get_client()
 
-    print("IDs DE CONFIGURACIÓN SIIGO")
-    print("=" * 40)
-
-    try:
-        print("\nTipos de Documento:")
-        for dt in client.get_document_types():
-            print(f"  ID: {dt.get('id')} - {dt.get('name')}")
-    except Exception as e:
-        print(f"  Error: {e}")
+    tasks = {
+        "Tipos de Documento": (client.get_document_types, lambda dt: f"ID: {dt.get('id')} - {dt.get('name')}"),
+        "Métodos de Pago": (client.get_payment_types, lambda pt: f"ID: {pt.get('id')} - {pt.get('name')}"),
+        "Impuestos": (client.get_taxes, lambda tax: f"ID: {tax.get('id')} - {tax.get('name')} ({tax.get('percentage')}%)"),
+        "Vendedores": (client.get_sellers, lambda s: f"ID: {s.get('id')} - {s.get('first_name')} {s.get('last_name')}"),
+    }
 
-    try:
-        print("\nMétodos de Pago:")
-        for pt in client.get_payment_types():
-            print(f"  ID: {pt.get('id')} - {pt.get('name')}")
-    except Exception as e:
-        print(f"  Error: {e}")
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {title: executor.submit(fetch) for title, (fetch, _) in tasks.items()}
 
-    try:
-        print("\nImpuestos:")
-        for tax in client.get_taxes():
-            print(f"  ID: {tax.get('id')} - {tax.get('name')} ({tax.get('percentage')}%)")
-    except Exception as e:
-        print(f"  Error: {e}")
+    print("IDs DE CONFIGURACIÓN SIIGO")
+    print("=" * 40)
 
-    try:
-        print("\nVendedores:")
-        for s in client.get_sellers():
-            print(f"  ID: {s.get('id')} - {s.get('first_name')} {s.get('last_name')}")
-    except Exception as e:
-        print(f"  Error: {e}")
+    for title, (_, fmt) in tasks.items():
+        print(f"\n{title}:")
+        try:
+            for entry in futures[title].result():
+                print(f"  {fmt(entry)}")
+        except Exception as e:
+            print(f"  Error: {e}")
 
     print("\n" + "=" * 40)
     print("Usa estos IDs con configurar_siigo()")
@@ -1,8 +1,72 @@
 """Siigo API Client for Invoice Management."""
 
+import copy
+import functools
+import inspect
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 15.0)
+PDF_CHUNK_SIZE = 64 * 1024
+
+_INVOICE_FILTERS = (
+    "created_start", "created_end", "date_start", "date_end", "updated_start", "updated_end",
+    "customer_identification", "customer_branch_office", "name",
+)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+class _CappedRetry(Retry):
+    """Retry that never sleeps longer than MAX_RETRY_AFTER for a Retry-After header."""
+
+    MAX_RETRY_AFTER = 10.0
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.MAX_RETRY_AFTER)
+
+
+def ttl_cache(ttl: float) -> Callable[[_F], _F]:
+    """
+    Cache a SiigoClient method's result per instance for ttl seconds.
+
+    Concurrent misses on the same key make a single request, and callers get
+    a copy so mutating a result cannot corrupt the cache.
+    """
+    def decorator(fn: _F) -> _F:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self: "SiigoClient", *args: Any, **kwargs: Any) -> Any:
+            # Bind so f(), f("FV") and f(document_type="FV") share one key.
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (fn.__name__, tuple(bound.arguments.items())[1:])
+
+            cached = self._metadata_cache.get(key)
+            if cached is None or cached[0] <= time.monotonic():
+                with self._metadata_locks.setdefault(key, threading.Lock()):
+                    cached = self._metadata_cache.get(key)
+                    if cached is None or cached[0] <= time.monotonic():
+                        value = fn(self, *args, **kwargs)
+                        cached = (time.monotonic() + ttl, value)
+                        self._metadata_cache[key] = cached
+            return copy.deepcopy(cached[1])
+        return wrapper  # type: ignore[return-value]
+    return decorator
 
 
 class SiigoAuthError(Exception):
@@ -20,17 +84,78 @@ class SiigoClient:
     BASE_URL = "https://api.siigo.com"
     AUTH_ENDPOINT = "/auth"
     INVOICES_ENDPOINT = "/v1/invoices"
+    PREFETCH_WINDOW = timedelta(hours=2)
+    METADATA_TTL = 3600
 
-    def __init__(self, username: str, access_key: str, application_name: str = "MyApp"):
+    def __init__(
+        self,
+        username: str,
+        access_key: str,
+        application_name: str = "MyApp",
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        retry_post: bool = False,
+    ):
         self.username = username
         self.access_key = access_key
         self.application_name = application_name
+        self.timeout = timeout
+        self.retry_post = retry_post
         self._access_token: Optional[str] = None
         self._token_expiry: Optional[datetime] = None
-    
+        self._refresh_jitter = timedelta(0)
+        self._refresh_lock = threading.Lock()
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="siigo-auth")
+        self._prefetch_future: Optional[Future] = None
+        self._metadata_cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._metadata_locks: Dict[Tuple, threading.Lock] = {}
+        self._session = self._build_session(frozenset(["GET", "PUT", "DELETE"]))
+        # retry_post covers create_invoice only, which sends an Idempotency-Key.
+        # Other POSTs (/auth, /mail) stay on the main session and are never retried,
+        # so a flaky /mail cannot send the customer duplicate emails.
+        self._invoice_session: Optional[requests.Session] = None
+        if retry_post:
+            self._invoice_session = self._build_session(frozenset(["POST"]))
+
+    @staticmethod
+    def _build_session(retry_methods: frozenset) -> requests.Session:
+        session = requests.Session()
+        # Keep worst-case latency bounded: one read retry (a read timeout already
+        # cost a full read window) and Retry-After sleeps capped by _CappedRetry.
+        retry = _CappedRetry(
+            total=3,
+            read=1,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=retry_methods,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+        return session
+
+    def invalidate_metadata_cache(self) -> None:
+        self._metadata_cache.clear()
+
+    def close(self) -> None:
+        self._prefetch_executor.shutdown(wait=True)
+        self._session.close()
+        if self._invoice_session is not None:
+            self._invoice_session.close()
+
+    def __enter__(self) -> "SiigoClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _get_auth_headers(self) -> Dict[str, str]:
         if self._needs_token_refresh():
-            self._authenticate()
+            # Single-flight: concurrent callers wait for one refresh instead of each re-authenticating.
+            with self._refresh_lock:
+                if self._needs_token_refresh():
+                    self._request_token()
+        else:
+            self._maybe_prefetch()
         return {
             "Authorization": f"Bearer {self._access_token}",
             "Content-Type": "application/json",
@@ -40,36 +165,68 @@ class SiigoClient:
     def _needs_token_refresh(self) -> bool:
         if not self._access_token or not self._token_expiry:
             return True
-        return datetime.now() >= self._token_expiry - timedelta(hours=1)
+        return datetime.now() >= self._token_expiry - timedelta(hours=1) - self._refresh_jitter
+
+    def _maybe_prefetch(self) -> None:
+        """Renew the token in the background once less than PREFETCH_WINDOW remains."""
+        if datetime.now() < self._token_expiry - self.PREFETCH_WINDOW:
+            return
+        if self._prefetch_future is not None and not self._prefetch_future.done():
+            return
+        self._prefetch_future = self._prefetch_executor.submit(self._prefetch_token)
 
-    def _authenticate(self) -> None:
+    def _prefetch_token(self) -> None:
+        with self._refresh_lock:
+            # A synchronous refresh may have finished while we waited for the lock.
+            if datetime.now() < self._token_expiry - self.PREFETCH_WINDOW:
+                return
+            try:
+                self._request_token()
+            except SiigoAuthError:
+                # The current token is still valid; the synchronous path retries later.
+                pass
+
+    def _request_token(self) -> None:
         url = f"{self.BASE_URL}{self.AUTH_ENDPOINT}"
         payload = {"username": self.username, "access_key": self.access_key}
         headers = {"Content-Type": "application/json", "Partner-Id": self.application_name}
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = self._session.request("POST", url, data=orjson.dumps(payload), headers=headers, timeout=self.timeout)
             response.raise_for_status()
-            self._access_token = response.json().get("access_token")
+            self._access_token = orjson.loads(response.content).get("access_token")
             self._token_expiry = datetime.now() + timedelta(hours=24)
+            self._refresh_jitter = timedelta(seconds=random.randint(0, 600))
         except requests.exceptions.HTTPError as e:
             raise SiigoAuthError(f"Authentication failed: {e.response.status_code} - {e.response.text}")
         except requests.exceptions.RequestException as e:
             raise SiigoAuthError(f"Connection error: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            raise SiigoAuthError(f"Invalid authentication response: {str(e)}")
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        extra_headers: Optional[Dict[str, str]] = None,
+        session: Optional[requests.Session] = None,
+    ) -> Dict[str, Any]:
         url = f"{self.BASE_URL}{endpoint}"
         headers = self._get_auth_headers()
+        if extra_headers:
+            headers.update(extra_headers)
 
         try:
-            response = requests.request(method=method, url=url, headers=headers, json=data, params=params)
+            response = (session or self._session).request(method=method, url=url, headers=headers, data=orjson.dumps(data) if data is not None else None, params=params, timeout=self.timeout)
             response.raise_for_status()
-            return response.json() if response.content else {}
+            return orjson.loads(response.content) if response.content else {}
         except requests.exceptions.HTTPError as e:
             error_response = {}
             try:
-                error_response = e.response.json()
-            except:
+                error_response = orjson.loads(e.response.content)
+            except orjson.JSONDecodeError:
                 pass
             raise SiigoAPIError(
                 f"API request failed: {e.response.status_code} - {e.response.text}",
@@ -78,6 +235,8 @@ class SiigoClient:
             )
         except requests.exceptions.RequestException as e:
             raise SiigoAPIError(f"Connection error: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            raise SiigoAPIError(f"Invalid JSON response: {str(e)}", status_code=response.status_code)
     
     def get_invoices(
         self,
@@ -94,31 +253,26 @@ class SiigoClient:
         name: Optional[str] = None,
     ) -> Dict[str, Any]:
         params = {"page": page, "page_size": min(page_size, 100)}
-        if created_start:
-            params["created_start"] = created_start
-        if created_end:
-            params["created_end"] = created_end
-        if date_start:
-            params["date_start"] = date_start
-        if date_end:
-            params["date_end"] = date_end
-        if updated_start:
-            params["updated_start"] = updated_start
-        if updated_end:
-            params["updated_end"] = updated_end
-        if customer_identification:
-            params["customer_identification"] = customer_identification
-        if customer_branch_office:
-            params["customer_branch_office"] = customer_branch_office
-        if name:
-            params["name"] = name
+        filters = (
+            created_start, created_end, date_start, date_end, updated_start, updated_end,
+            customer_identification, customer_branch_office, name,
+        )
+        params.update((k, v) for k, v in zip(_INVOICE_FILTERS, filters) if v)
         return self._make_request("GET", self.INVOICES_ENDPOINT, params=params)
 
     def get_invoice(self, invoice_id: str) -> Dict[str, Any]:
         return self._make_request("GET", f"{self.INVOICES_ENDPOINT}/{invoice_id}")
 
     def create_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("POST", self.INVOICES_ENDPOINT, data=invoice_data)
+        extra_headers = None
+        if self.retry_post:
+            # One key per call: urllib3 retries resend the same headers, while two
+            # identical parking exits still get distinct keys.
+            extra_headers = {"Idempotency-Key": uuid.uuid4().hex}
+        return self._make_request(
+            "POST", self.INVOICES_ENDPOINT, data=invoice_data,
+            extra_headers=extra_headers, session=self._invoice_session,
+        )
 
     def update_invoice(self, invoice_id: str, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         return self._make_request("PUT", f"{self.INVOICES_ENDPOINT}/{invoice_id}", data=invoice_data)
@@ -126,13 +280,21 @@ class SiigoClient:
     def delete_invoice(self, invoice_id: str) -> Dict[str, Any]:
         return self._make_request("DELETE", f"{self.INVOICES_ENDPOINT}/{invoice_id}")
 
-    def get_invoice_pdf(self, invoice_id: str) -> bytes:
+    def get_invoice_pdf(self, invoice_id: str, out: Optional[BinaryIO] = None) -> Optional[bytes]:
+        """Download an invoice PDF, writing it to out if given, else returning the bytes."""
         url = f"{self.BASE_URL}{self.INVOICES_ENDPOINT}/{invoice_id}/pdf"
-        headers = self._get_auth_headers()
+        # PDFs are already compressed; skip gzip so chunks can be written as they arrive.
+        headers = {**self._get_auth_headers(), "Accept-Encoding": "identity"}
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.content
+            with self._session.request("GET", url, headers=headers, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                buffer = bytearray() if out is None else None
+                for chunk in response.iter_content(chunk_size=PDF_CHUNK_SIZE):
+                    if buffer is None:
+                        out.write(chunk)
+                    else:
+                        buffer += chunk
+            return None if buffer is None else bytes(buffer)
         except requests.exceptions.HTTPError as e:
             raise SiigoAPIError(f"Failed to get invoice PDF: {e.response.status_code}", status_code=e.response.status_code)
 
@@ -142,15 +304,19 @@ class SiigoClient:
             data["copy_to"] = copy_to
         return self._make_request("POST", f"{self.INVOICES_ENDPOINT}/{invoice_id}/mail", data=data)
     
+    @ttl_cache(METADATA_TTL)
     def get_document_types(self) -> List[Dict[str, Any]]:
         return self._make_request("GET", "/v1/document-types", params={"type": "FV"})
 
+    @ttl_cache(METADATA_TTL)
     def get_payment_types(self, document_type: str = "FV") -> List[Dict[str, Any]]:
         return self._make_request("GET", "/v1/payment-types", params={"document_type": document_type})
 
+    @ttl_cache(METADATA_TTL)
     def get_taxes(self) -> List[Dict[str, Any]]:
         return self._make_request("GET", "/v1/taxes")
 
+    @ttl_cache(METADATA_TTL)
     def get_sellers(self) -> List[Dict[str, Any]]:
         return self._make_request("GET", "/v1/users", params={"role": "seller"})
 
@@ -163,8 +329,10 @@ class SiigoClient:
             params["identification"] = identification
         return self._make_request("GET", "/v1/customers", params=params)
 
+    @ttl_cache(METADATA_TTL)
     def get_warehouses(self) -> List[Dict[str, Any]]:
         return self._make_request("GET", "/v1/warehouses")
 
+    @ttl_cache(METADATA_TTL)
     def get_cost_centers(self) -> List[Dict[str, Any]]:
         return self._make_request("GET", "/v1/cost-centers")
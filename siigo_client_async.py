@@ -0,0 +1,205 @@
+"""Async Siigo API Client for concurrent invoice pipelines."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+import orjson
+
+from siigo_client import _INVOICE_FILTERS, DEFAULT_TIMEOUT, SiigoAPIError, SiigoAuthError, SiigoClient
+
+
+class AsyncSiigoClient:
+    BASE_URL = SiigoClient.BASE_URL
+    AUTH_ENDPOINT = SiigoClient.AUTH_ENDPOINT
+    INVOICES_ENDPOINT = SiigoClient.INVOICES_ENDPOINT
+
+    def __init__(
+        self,
+        username: str,
+        access_key: str,
+        application_name: str = "MyApp",
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+    ):
+        self.username = username
+        self.access_key = access_key
+        self.application_name = application_name
+        self.timeout = timeout
+        self._access_token: Optional[str] = None
+        self._token_expiry: Optional[datetime] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # HTTP/2 lets concurrent requests share one connection as separate streams.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                base_url=self.BASE_URL,
+                timeout=self._httpx_timeout(),
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=75),
+            )
+            self._client_loop = loop
+            self._auth_lock = asyncio.Lock()
+        return self._client
+
+    def _httpx_timeout(self) -> httpx.Timeout:
+        # Same (connect, read) convention as SiigoClient and requests.
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(self.timeout)
+
+    def adopt_token(self, other: "AsyncSiigoClient") -> None:
+        """Reuse other's access token, if it is newer than ours."""
+        if other._token_expiry and (not self._token_expiry or other._token_expiry > self._token_expiry):
+            self._access_token = other._access_token
+            self._token_expiry = other._token_expiry
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+        self._auth_lock = None
+
+    async def __aenter__(self) -> "AsyncSiigoClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _get_auth_headers(self) -> Dict[str, str]:
+        if self._needs_token_refresh():
+            self._get_client()
+            async with self._auth_lock:
+                if self._needs_token_refresh():
+                    await self._authenticate()
+        return {
+            "Authorization": f"Bearer {self._access_token}",
+            "Content-Type": "application/json",
+            "Partner-Id": self.application_name,
+        }
+
+    def _needs_token_refresh(self) -> bool:
+        if not self._access_token or not self._token_expiry:
+            return True
+        return datetime.now() >= self._token_expiry - timedelta(hours=1)
+
+    async def _authenticate(self) -> None:
+        payload = {"username": self.username, "access_key": self.access_key}
+        headers = {"Content-Type": "application/json", "Partner-Id": self.application_name}
+
+        try:
+            response = await self._get_client().post(self.AUTH_ENDPOINT, content=orjson.dumps(payload), headers=headers)
+            response.raise_for_status()
+            self._access_token = orjson.loads(response.content).get("access_token")
+            self._token_expiry = datetime.now() + timedelta(hours=24)
+        except httpx.HTTPStatusError as e:
+            raise SiigoAuthError(f"Authentication failed: {e.response.status_code} - {e.response.text}")
+        except httpx.RequestError as e:
+            raise SiigoAuthError(f"Connection error: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            raise SiigoAuthError(f"Invalid authentication response: {str(e)}")
+
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+        headers = await self._get_auth_headers()
+
+        try:
+            response = await self._get_client().request(method, endpoint, headers=headers, content=orjson.dumps(data) if data is not None else None, params=params)
+            response.raise_for_status()
+            return orjson.loads(response.content) if response.content else {}
+        except httpx.HTTPStatusError as e:
+            error_response = {}
+            try:
+                error_response = orjson.loads(e.response.content)
+            except orjson.JSONDecodeError:
+                pass
+            raise SiigoAPIError(
+                f"API request failed: {e.response.status_code} - {e.response.text}",
+                status_code=e.response.status_code,
+                response=error_response
+            )
+        except httpx.RequestError as e:
+            raise SiigoAPIError(f"Connection error: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            raise SiigoAPIError(f"Invalid JSON response: {str(e)}", status_code=response.status_code)
+
+    async def get_invoices(
+        self,
+        page: int = 1,
+        page_size: int = 25,
+        created_start: Optional[str] = None,
+        created_end: Optional[str] = None,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        updated_start: Optional[str] = None,
+        updated_end: Optional[str] = None,
+        customer_identification: Optional[str] = None,
+        customer_branch_office: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        params = {"page": page, "page_size": min(page_size, 100)}
+        filters = (
+            created_start, created_end, date_start, date_end, updated_start, updated_end,
+            customer_identification, customer_branch_office, name,
+        )
+        params.update((k, v) for k, v in zip(_INVOICE_FILTERS, filters) if v)
+        return await self._make_request("GET", self.INVOICES_ENDPOINT, params=params)
+
+    async def get_invoice(self, invoice_id: str) -> Dict[str, Any]:
+        return await self._make_request("GET", f"{self.INVOICES_ENDPOINT}/{invoice_id}")
+
+    async def create_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("POST", self.INVOICES_ENDPOINT, data=invoice_data)
+
+    async def update_invoice(self, invoice_id: str, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("PUT", f"{self.INVOICES_ENDPOINT}/{invoice_id}", data=invoice_data)
+
+    async def delete_invoice(self, invoice_id: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", f"{self.INVOICES_ENDPOINT}/{invoice_id}")
+
+    async def get_invoice_pdf(self, invoice_id: str) -> bytes:
+        headers = await self._get_auth_headers()
+        try:
+            response = await self._get_client().get(f"{self.INVOICES_ENDPOINT}/{invoice_id}/pdf", headers=headers)
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPStatusError as e:
+            raise SiigoAPIError(f"Failed to get invoice PDF: {e.response.status_code}", status_code=e.response.status_code)
+
+    async def send_invoice_email(self, invoice_id: str, email: str, copy_to: Optional[List[str]] = None) -> Dict[str, Any]:
+        data = {"mail_to": email}
+        if copy_to:
+            data["copy_to"] = copy_to
+        return await self._make_request("POST", f"{self.INVOICES_ENDPOINT}/{invoice_id}/mail", data=data)
+
+    async def get_document_types(self) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", "/v1/document-types", params={"type": "FV"})
+
+    async def get_payment_types(self, document_type: str = "FV") -> List[Dict[str, Any]]:
+        return await self._make_request("GET", "/v1/payment-types", params={"document_type": document_type})
+
+    async def get_taxes(self) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", "/v1/taxes")
+
+    async def get_sellers(self) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", "/v1/users", params={"role": "seller"})
+
+    async def get_products(self, page: int = 1, page_size: int = 100) -> Dict[str, Any]:
+        return await self._make_request("GET", "/v1/products", params={"page": page, "page_size": page_size})
+
+    async def get_customers(self, page: int = 1, page_size: int = 100, identification: str = None) -> Dict[str, Any]:
+        params = {"page": page, "page_size": page_size}
+        if identification:
+            params["identification"] = identification
+        return await self._make_request("GET", "/v1/customers", params=params)
+
+    async def get_warehouses(self) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", "/v1/warehouses")
+
+    async def get_cost_centers(self) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", "/v1/cost-centers")
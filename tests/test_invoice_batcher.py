@@ -0,0 +1,36 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_pending_invoices_are_sent_at_interpreter_exit():
+    script = textwrap.dedent("""
+        from invoice_batcher import InvoiceBatcher
+
+        class StubClient:
+            def create_invoice(self, invoice_data):
+                print("created", invoice_data["n"], flush=True)
+                return {"id": "1"}
+
+            def send_invoice_email(self, invoice_id, email):
+                pass
+
+        # Ventana larga: la factura sigue pendiente cuando el script termina.
+        batcher = InvoiceBatcher(StubClient(), flush_ms=5000, max_wait_ms=10000)
+        batcher.enqueue({"n": 1})
+    """)
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "created 1" in result.stdout
+    assert "Traceback" not in result.stderr